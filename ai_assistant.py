@@ -1,65 +1,232 @@
 """AI assistant for thruster efficiency predictions."""
-import openai
+import hashlib
+import math
 import os
-from typing import Dict, List, Optional
-from models import GridSpecifications
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from pydantic import BaseModel
+from models import GridSpecifications, THRUSTER_KINDS
+
+# Static prompt text is kept byte-identical across calls so it forms a cacheable
+# prefix; only the numeric grid values after the separator vary per request.
+SYSTEM_PROMPT = (
+    "SE thruster optimizer. Fill in efficiency, optimization and use_cases.\n"
+    "Atmospheric thrusters only work in atmosphere. Ion thrusters are weak in "
+    "atmosphere and best in space. Hydrogen thrusters work everywhere but burn fuel.\n"
+    "Efficiency: assess the current setup. Optimization: recommend specific changes. "
+    "Use Cases: suggest ideal scenarios for this configuration."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "SE thruster optimizer. For every numbered grid, assess Efficiency, Optimization "
+    "and Use Cases.\n"
+    "Atmospheric thrusters only work in atmosphere. Ion thrusters are weak in "
+    "atmosphere and best in space. Hydrogen thrusters work everywhere but burn fuel.\n"
+    "Reply with a JSON object: {\"analyses\": [{\"idx\": <grid number>, "
+    "\"efficiency\": str, \"optimization\": str, \"use_cases\": str}]}."
+)
+
+USER_PROMPT_HEADER = (
+    "Analyze this Space Engineers grid configuration.\n"
+    "---\n"
+)
+
+BATCH_PROMPT_HEADER = (
+    "Analyze each numbered Space Engineers grid configuration.\n"
+    "---\n"
+)
+
+GRID_VALUES_TEMPLATE = (
+    "Mass (kg): %.2f\n"
+    "Total Thrust (N): %.2f\n"
+    "Thrust-to-Weight Ratio: %.2f\n"
+    "Atmospheric Thrust (N): %.2f\n"
+    "Ion Thrust (N): %.2f\n"
+    "Hydrogen Thrust (N): %.2f\n"
+    "Lift Capacity (kg): %.2f\n"
+)
+
+class Analysis(BaseModel):
+    """Structured analysis returned by the model."""
+    efficiency: str
+    optimization: str
+    use_cases: str
+
+# Advice when a single thruster type supplies more than 60% of total thrust
+BALANCE_MESSAGES = {
+    'atmospheric': "Heavy atmospheric focus - consider diversifying for space operations",
+    'ion': "Heavy ion focus - may struggle in atmosphere",
+    'hydrogen': "Heavy hydrogen focus - check fuel efficiency"
+}
+
+# Condition bits indexing SUGGESTION_TABLE
+TWR_LOW = 1
+TWR_HIGH = 2
+ATMOSPHERIC_SHORT = 4
+SPACE_SHORT = 8
+TWR_ZERO = 16
+
+NO_THRUSTERS_SUGGESTIONS = ("Add thrusters to begin analysis",)
+
+def _suggestions_for_state(state: int) -> Tuple[str, ...]:
+    """Build the suggestion list for one combination of condition bits."""
+    suggestions = []
+
+    if state & TWR_ZERO:
+        suggestions.append("Add mass and thrusters to calculate thrust-to-weight ratio")
+    elif state & TWR_LOW:
+        suggestions.append("Add more thrusters to improve lift capacity")
+    elif state & TWR_HIGH:
+        suggestions.append("Consider reducing thrust for better efficiency")
+
+    if state & ATMOSPHERIC_SHORT:
+        suggestions.append("Increase atmospheric thrusters for better planet performance")
+
+    if state & SPACE_SHORT:
+        suggestions.append("Increase ion/hydrogen thrusters for space operations")
+
+    return tuple(suggestions)
+
+SUGGESTION_TABLE = tuple(_suggestions_for_state(state) for state in range(32))
 
 class ThrusterAIAssistant:
+    # Shared across instances so repeated submissions of the same grid skip the API
+    _cache = TTLCache(maxsize=512, ttl=3600)
+    # Analyses run on worker threads, and cachetools caches are not thread-safe
+    _cache_lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
     def __init__(self):
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        self.system_prompt = """
-You are an AI assistant specializing in Space Engineers thruster configurations.
-Analyze grid specifications and provide optimization suggestions.
-Focus on:
-- Thruster type distribution
-- Mass-to-thrust ratio
-- Power efficiency
-- Atmospheric vs Space performance
-Provide specific, actionable recommendations.
-"""
+        self._openai = None
+        self._openai_lock = threading.Lock()
+        self.system_prompt = SYSTEM_PROMPT
+
+    def _client(self):
+        """Return the OpenAI client, importing the SDK on first use."""
+        # The SDK is slow to import, so app start-up does not pay for it
+        with self._openai_lock:
+            if self._openai is None:
+                import httpx
+                import openai
+
+                # Keep-alive pool so warm reruns reuse the TLS connection
+                self._openai = openai.OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=10))
+                )
+            return self._openai
+
+    @staticmethod
+    def _hash_key(specs: GridSpecifications) -> str:
+        """Build a canonical content hash for a grid configuration."""
+        payload = orjson.dumps(specs.to_dict(), option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    def _bucket_key(self, specs: GridSpecifications) -> tuple:
+        """Build a coarse key for grids that differ only by small numeric tweaks."""
+        twr, thrust_vec = self._metrics(specs)
+        total_thrust = thrust_vec.sum()
+        shares = thrust_vec / total_thrust * 100 if total_thrust > 0 else thrust_vec
+        return (
+            round(twr * 10),
+            tuple(int(round(share / 5) * 5) for share in shares),
+            round(math.log10(specs.mass) * 4) if specs.mass > 0 else None
+        )
+
+    def _get_analysis(self, specs: GridSpecifications) -> Optional[Dict[str, str]]:
+        """Look up a cached analysis, preferring a matching bucket entry over an exact one."""
+        # A bucket hit is only served when the deterministic suggestions match,
+        # so the cached advice cannot contradict the local analysis
+        entry = self._cache_peek(("bucket", self._bucket_key(specs)))
+        if entry is not None and entry[0] == tuple(self._generate_suggested_changes(specs)):
+            return self._record_lookup(entry[1])
+        return self._cache_get(("analysis", self._hash_key(specs)))
+
+    def _set_analysis(self, specs: GridSpecifications, result: Dict[str, str]):
+        """Cache an analysis under both its exact and bucket keys."""
+        self._cache_set(("analysis", self._hash_key(specs)), result)
+        self._cache_set(("bucket", self._bucket_key(specs)), (
+            tuple(self._generate_suggested_changes(specs)),
+            result
+        ))
+
+    def _cache_get(self, key: tuple):
+        """Look up a cached result, recording the hit or miss."""
+        return self._record_lookup(self._cache_peek(key))
+
+    def _cache_peek(self, key: tuple):
+        """Look up a cached result without recording it."""
+        with self._cache_lock:
+            return self._cache.get(key)
+
+    def _cache_set(self, key: tuple, value):
+        """Store a result in the shared cache."""
+        with self._cache_lock:
+            self._cache[key] = value
+
+    def _record_lookup(self, result):
+        """Record a cache hit or miss for the given lookup result."""
+        with self._cache_lock:
+            if result is None:
+                ThrusterAIAssistant._misses += 1
+            else:
+                ThrusterAIAssistant._hits += 1
+        return result
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return cache hit/miss counters for observability."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._cache)
+        }
+
+    def _build_prompt(self, specs: GridSpecifications) -> str:
+        """Format the user prompt describing a grid configuration."""
+        return USER_PROMPT_HEADER + self._format_grid_values(specs)
+
+    def _format_grid_values(self, specs: GridSpecifications) -> str:
+        """Format the numeric values describing a grid configuration."""
+        thrusts = specs.thrust_by_type
+        total_thrust = specs.total_thrust
+        lift_capacity = specs.lift_capacity
+        twr = total_thrust / (specs.mass * specs.gravity) if specs.mass > 0 else 0
+
+        return GRID_VALUES_TEMPLATE % (
+            specs.mass,
+            total_thrust,
+            twr,
+            thrusts['atmospheric'],
+            thrusts['ion'],
+            thrusts['hydrogen'],
+            lift_capacity
+        )
 
     def analyze_grid(self, specs: GridSpecifications) -> Dict[str, str]:
         """Analyze grid specifications and provide recommendations."""
-        thrusts = specs.calculate_thrust_by_type()
-        total_thrust = specs.calculate_total_thrust()
-        lift_capacity = specs.calculate_lift_capacity()
-        twr = total_thrust / (specs.mass * specs.gravity) if specs.mass > 0 else 0
+        cached = self._get_analysis(specs)
+        if cached is not None:
+            return cached
 
-        prompt = f"""
-Current Grid Configuration:
-- Mass: {specs.mass:,.2f} kg
-- Total Thrust: {total_thrust:,.2f} N
-- Thrust-to-Weight Ratio: {twr:.2f}
-- Atmospheric Thrust: {thrusts['atmospheric']:,.2f} N
-- Ion Thrust: {thrusts['ion']:,.2f} N
-- Hydrogen Thrust: {thrusts['hydrogen']:,.2f} N
-- Lift Capacity: {lift_capacity:,.2f} kg
-
-Please analyze this configuration and provide:
-1. Efficiency Assessment: Evaluate the current setup's efficiency
-2. Optimization Suggestions: Recommend improvements
-3. Use Case Analysis: Suggest ideal scenarios for this configuration
-"""
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
+            completion = self._client().beta.chat.completions.parse(
+                model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": self._build_prompt(specs)}
                 ],
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=500,
+                response_format=Analysis
             )
 
-            analysis = response.choices[0].message.content
-
-            # Split analysis into sections
-            sections = analysis.split("\n\n")
-            return {
-                "efficiency": sections[0] if len(sections) > 0 else "Analysis unavailable",
-                "optimization": sections[1] if len(sections) > 1 else "No optimization suggestions",
-                "use_cases": sections[2] if len(sections) > 2 else "No use case analysis"
-            }
+            result = completion.choices[0].message.parsed.model_dump()
+            self._set_analysis(specs, result)
+            return result
 
         except Exception as e:
             return {
@@ -68,10 +235,62 @@ Please analyze this configuration and provide:
                 "use_cases": "Analysis unavailable"
             }
 
+    def analyze_grids_batch(self, specs_list: List[GridSpecifications]) -> List[Dict[str, str]]:
+        """Analyze several grid configurations with a single request, in input order."""
+        results = [self._get_analysis(specs) for specs in specs_list]
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        prompt = BATCH_PROMPT_HEADER + "\n".join(
+            f"Grid {idx}\n" + self._format_grid_values(specs_list[idx])
+            for idx in pending
+        )
+
+        try:
+            response = self._client().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=500 * len(pending),
+                response_format={"type": "json_object"}
+            )
+            analyses = orjson.loads(response.choices[0].message.content)["analyses"]
+            by_idx = {int(item["idx"]): item for item in analyses}
+
+        except Exception as e:
+            for idx in pending:
+                results[idx] = {
+                    "efficiency": f"Error analyzing efficiency: {str(e)}",
+                    "optimization": "Analysis unavailable",
+                    "use_cases": "Analysis unavailable"
+                }
+            return results
+
+        for idx in pending:
+            item = by_idx.get(idx, {})
+            result = {
+                "efficiency": item.get("efficiency") or "Analysis unavailable",
+                "optimization": item.get("optimization") or "No optimization suggestions",
+                "use_cases": item.get("use_cases") or "No use case analysis"
+            }
+            if item:
+                self._set_analysis(specs_list[idx], result)
+            results[idx] = result
+
+        return results
+
     def suggest_improvements(self, current_specs: GridSpecifications) -> Dict[str, any]:
         """Suggest specific improvements for the current configuration."""
-        thrusts = current_specs.calculate_thrust_by_type()
-        total_thrust = current_specs.calculate_total_thrust()
+        key = ("suggestions", self._hash_key(current_specs))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        total_thrust = current_specs.total_thrust
 
         # Check for zero total thrust to avoid division by zero
         if total_thrust == 0:
@@ -81,81 +300,67 @@ Please analyze this configuration and provide:
                 "suggested_changes": ["Add thrusters to begin analysis"]
             }
 
-        # Calculate distribution percentages
-        thrust_distribution = {
-            k: (v / total_thrust) * 100 if total_thrust > 0 else 0 
-            for k, v in thrusts.items()
-        }
-
         suggestions = {
-            "thrust_balance": self._analyze_thrust_balance(thrust_distribution),
+            "thrust_balance": self._analyze_thrust_balance(current_specs),
             "efficiency_score": self._calculate_efficiency_score(current_specs),
             "suggested_changes": self._generate_suggested_changes(current_specs)
         }
 
+        self._cache_set(key, suggestions)
         return suggestions
 
-    def _analyze_thrust_balance(self, distribution: Dict[str, float]) -> str:
+    @staticmethod
+    def _metrics(specs: GridSpecifications) -> Tuple[float, np.ndarray]:
+        """Return the thrust-to-weight ratio and per-type thrust vector of a grid."""
+        thrusts = specs.thrust_by_type
+        thrust_vec = np.array([thrusts[kind] for kind in THRUSTER_KINDS], dtype=np.float64)
+        weight = specs.mass * specs.gravity
+        twr = float(thrust_vec.sum()) / weight if weight > 0 else 0.0
+        return twr, thrust_vec
+
+    def _analyze_thrust_balance(self, specs: GridSpecifications) -> str:
         """Analyze the balance of different thruster types."""
-        if all(v == 0 for v in distribution.values()):
+        _, thrust_vec = self._metrics(specs)
+        total_thrust = thrust_vec.sum()
+        if total_thrust == 0:
             return "No thrusters configured"
 
-        if distribution["atmospheric"] > 60:
-            return "Heavy atmospheric focus - consider diversifying for space operations"
-        elif distribution["ion"] > 60:
-            return "Heavy ion focus - may struggle in atmosphere"
-        elif distribution["hydrogen"] > 60:
-            return "Heavy hydrogen focus - check fuel efficiency"
+        dominant = int(np.argmax(thrust_vec))
+        if thrust_vec[dominant] / total_thrust > 0.6:
+            return BALANCE_MESSAGES[THRUSTER_KINDS[dominant]]
         return "Balanced thrust distribution"
 
     def _calculate_efficiency_score(self, specs: GridSpecifications) -> float:
         """Calculate an efficiency score (0-100) based on various factors."""
-        total_thrust = specs.calculate_total_thrust()
+        twr, thrust_vec = self._metrics(specs)
+        total_thrust = thrust_vec.sum()
 
         # Handle zero cases
-        if total_thrust == 0 or specs.mass == 0:
+        if total_thrust == 0:
             return 0
 
-        twr = total_thrust / (specs.mass * specs.gravity)
-
         # Base score on TWR
         base_score = min(100, max(0, twr * 20))
 
-        # Adjust for thrust distribution
-        thrusts = specs.calculate_thrust_by_type()
-        ideal_thrust = total_thrust / 3  # Ideal balanced distribution
-
-        distribution_penalty = sum(
-            abs(t - ideal_thrust) for t in thrusts.values()
-        ) / total_thrust * 20 if total_thrust > 0 else 100
+        # Penalize deviation from an even split across thruster types
+        distribution_penalty = float(np.abs(thrust_vec - thrust_vec.mean()).sum() / total_thrust) * 20
 
         return max(0, min(100, base_score - distribution_penalty))
 
-    def _generate_suggested_changes(self, specs: GridSpecifications) -> List[str]:
+    def _generate_suggested_changes(self, specs: GridSpecifications) -> Tuple[str, ...]:
         """Generate specific suggested changes for improvement."""
-        suggestions = []
-        total_thrust = specs.calculate_total_thrust()
-
-        if total_thrust == 0:
-            return ["Add thrusters to begin analysis"]
-
-        twr = total_thrust / (specs.mass * specs.gravity) if specs.mass > 0 else 0
-
-        if twr == 0:
-            suggestions.append("Add mass and thrusters to calculate thrust-to-weight ratio")
-        elif twr < 1.5:
-            suggestions.append("Add more thrusters to improve lift capacity")
-        elif twr > 4:
-            suggestions.append("Consider reducing thrust for better efficiency")
-
-        thrusts = specs.calculate_thrust_by_type()
-
-        # Check atmospheric capabilities
-        if specs.mass > 0 and thrusts["atmospheric"] < specs.mass * specs.gravity:
-            suggestions.append("Increase atmospheric thrusters for better planet performance")
+        twr, thrust_vec = self._metrics(specs)
+        if thrust_vec.sum() == 0:
+            return NO_THRUSTERS_SUGGESTIONS
 
-        # Check space capabilities
-        if specs.mass > 0 and thrusts["ion"] + thrusts["hydrogen"] < specs.mass * specs.gravity:
-            suggestions.append("Increase ion/hydrogen thrusters for space operations")
+        required_thrust = specs.mass * specs.gravity
+        atmospheric, ion, hydrogen = thrust_vec.tolist()
 
-        return suggestions
\ No newline at end of file
+        state = (
+            (twr < 1.5) * TWR_LOW
+            | (twr > 4) * TWR_HIGH
+            | (atmospheric < required_thrust) * ATMOSPHERIC_SHORT
+            | (ion + hydrogen < required_thrust) * SPACE_SHORT
+            | (twr == 0) * TWR_ZERO
+        )
+        return SUGGESTION_TABLE[state]
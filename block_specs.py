@@ -1,4 +1,5 @@
 """Space Engineers block specifications for mass calculations."""
+import numpy as np
 
 # Block masses in kg
 BLOCK_MASSES = {
@@ -41,6 +42,22 @@ BLOCK_MASSES = {
     }
 }
 
+# Block types grouped for the block calculator inputs
+BLOCK_CATEGORIES = {
+    'Armor': ['light_armor_block', 'heavy_armor_block'],
+    'Structural': ['steel_plate', 'interior_plate'],
+    'Functional': ['cargo_container', 'refinery', 'assembler', 'reactor']
+}
+
+BLOCK_DISPLAY_NAMES = {
+    block_type: block_type.replace('_', ' ').title() for block_type in BLOCK_MASSES
+}
+
+# Mass vectors in a fixed block order for dot-product mass calculation
+BLOCK_ORDER = tuple(BLOCK_MASSES)
+SMALL_BLOCK_MASSES = np.array([BLOCK_MASSES[k]['small'] for k in BLOCK_ORDER], dtype=np.float64)
+LARGE_BLOCK_MASSES = np.array([BLOCK_MASSES[k]['large'] for k in BLOCK_ORDER], dtype=np.float64)
+
 def calculate_total_mass(block_counts: dict) -> float:
     """
     Calculate total mass based on block counts.
@@ -51,11 +68,15 @@ def calculate_total_mass(block_counts: dict) -> float:
     Returns:
         float: Total mass in kg
     """
-    total_mass = 0.0
-    
-    for block_type, (small_count, large_count) in block_counts.items():
-        if block_type in BLOCK_MASSES:
-            block_specs = BLOCK_MASSES[block_type]
-            total_mass += (small_count * block_specs['small']) + (large_count * block_specs['large'])
+    small_counts = np.fromiter(
+        (block_counts.get(block_type, (0, 0))[0] for block_type in BLOCK_ORDER),
+        dtype=np.int64,
+        count=len(BLOCK_ORDER)
+    )
+    large_counts = np.fromiter(
+        (block_counts.get(block_type, (0, 0))[1] for block_type in BLOCK_ORDER),
+        dtype=np.int64,
+        count=len(BLOCK_ORDER)
+    )
     
-    return total_mass
+    return float(small_counts @ SMALL_BLOCK_MASSES + large_counts @ LARGE_BLOCK_MASSES)
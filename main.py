@@ -1,12 +1,14 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 import streamlit as st
-import numpy as np
 from utils import (
     create_thrust_chart, create_comparison_chart, create_metrics_comparison,
     load_css, save_preset, load_preset, format_number, get_thrust_tooltip,
     export_grid_to_csv, create_pdf_report, get_ai_analysis_tooltip
 )
 from models import GridSpecifications, Preset, ThrusterCount
-from block_specs import BLOCK_MASSES, calculate_total_mass
+from block_specs import (
+    BLOCK_MASSES, BLOCK_CATEGORIES, BLOCK_DISPLAY_NAMES, calculate_total_mass
+)
 from ai_assistant import ThrusterAIAssistant
 
 def create_thruster_inputs(title: str, key_prefix: str, help_text: str):
@@ -62,15 +64,37 @@ def create_block_inputs(block_type: str, block_specs: dict, key_prefix: str):
 
     return small, large
 
-def show_ai_analysis(specs: GridSpecifications):
+@st.cache_resource
+def get_ai_assistant() -> ThrusterAIAssistant:
+    """Return the assistant shared across reruns and sessions."""
+    return ThrusterAIAssistant()
+
+@st.cache_resource
+def get_ai_executor() -> ThreadPoolExecutor:
+    """Return the worker pool used for background AI requests."""
+    return ThreadPoolExecutor(max_workers=4)
+
+def submit_ai_analysis(specs: GridSpecifications) -> Future:
+    """Start the AI analysis for a grid in the background, reusing a pending request."""
+    pending = st.session_state.get("ai_future")
+    if pending is None or pending[0] != specs:
+        try:
+            future = get_ai_executor().submit(get_ai_assistant().analyze_grid, specs)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        st.session_state.ai_future = (specs, future)
+    return st.session_state.ai_future[1]
+
+def show_ai_analysis(specs: GridSpecifications, analysis_future: Future):
     """Display AI analysis of the grid configuration."""
     st.subheader("🤖 AI Analysis")
     st.info(get_ai_analysis_tooltip())
 
     try:
         with st.spinner("Analyzing grid configuration..."):
-            ai_assistant = ThrusterAIAssistant()
-            analysis = ai_assistant.analyze_grid(specs)
+            analysis = analysis_future.result(timeout=30)
+            ai_assistant = get_ai_assistant()
             suggestions = ai_assistant.suggest_improvements(specs)
 
             st.markdown('<div class="ai-analysis">', unsafe_allow_html=True)
@@ -120,6 +144,31 @@ def show_ai_analysis(specs: GridSpecifications):
         - Verify that the grid mass is greater than zero
         """)
 
+def show_preset_analyses(presets: dict):
+    """Display AI analysis of every saved preset from a single batched request."""
+    try:
+        with st.spinner("Analyzing presets..."):
+            loaded = list(presets.values())
+            ai_assistant = get_ai_assistant()
+            analyses = ai_assistant.analyze_grids_batch(
+                [preset.specifications for preset in loaded]
+            )
+
+        for preset, analysis in zip(loaded, analyses):
+            with st.expander(preset.name, expanded=True):
+                st.markdown("#### 📊 Efficiency Assessment")
+                st.markdown(analysis["efficiency"])
+                st.markdown("#### 🔧 Optimization Suggestions")
+                st.markdown(analysis["optimization"])
+                st.markdown("#### 🎯 Recommended Use Cases")
+                st.markdown(analysis["use_cases"])
+
+    except Exception as e:
+        st.error(f"""
+        Unable to generate AI analysis at this time. 
+        Error: {str(e)}
+        """)
+
 def main():
     st.set_page_config(
         page_title="Space Engineers Lift Calculator",
@@ -166,35 +215,15 @@ def main():
             st.markdown("#### Block Configuration")
             block_counts = {}
 
-            # Armor blocks
-            st.markdown("##### Armor Blocks")
-            for block_type in ['light_armor_block', 'heavy_armor_block']:
-                display_name = block_type.replace('_', ' ').title()
-                block_counts[block_type] = create_block_inputs(
-                    block_type,
-                    BLOCK_MASSES[block_type],
-                    f"block_{block_type}"
-                )
-
-            # Structural blocks
-            st.markdown("##### Structural Blocks")
-            for block_type in ['steel_plate', 'interior_plate']:
-                display_name = block_type.replace('_', ' ').title()
-                block_counts[block_type] = create_block_inputs(
-                    block_type,
-                    BLOCK_MASSES[block_type],
-                    f"block_{block_type}"
-                )
-
-            # Functional blocks
-            st.markdown("##### Functional Blocks")
-            for block_type in ['cargo_container', 'refinery', 'assembler', 'reactor']:
-                display_name = block_type.replace('_', ' ').title()
-                block_counts[block_type] = create_block_inputs(
-                    block_type,
-                    BLOCK_MASSES[block_type],
-                    f"block_{block_type}"
-                )
+            for category, block_types in BLOCK_CATEGORIES.items():
+                st.markdown(f"##### {category} Blocks")
+                for block_type in block_types:
+                    st.caption(BLOCK_DISPLAY_NAMES[block_type])
+                    block_counts[block_type] = create_block_inputs(
+                        block_type,
+                        BLOCK_MASSES[block_type],
+                        f"block_{block_type}"
+                    )
 
             calculated_mass = calculate_total_mass(block_counts)
             st.markdown(f"#### Calculated Mass: {format_number(calculated_mass)} kg")
@@ -272,13 +301,16 @@ def main():
     if 'calculated' in st.session_state and st.session_state.calculated:
         st.header("Results")
 
+        # Start the AI request first so it overlaps rendering the results below
+        analysis_future = submit_ai_analysis(specs)
+
         results_col1, results_col2 = st.columns(2)
 
         with results_col1:
             st.markdown("### Thrust Analysis")
-            total_thrust = specs.calculate_total_thrust()
-            thrust_by_type = specs.calculate_thrust_by_type()
-            lift_capacity = specs.calculate_lift_capacity()
+            total_thrust = specs.total_thrust
+            thrust_by_type = specs.thrust_by_type
+            lift_capacity = specs.lift_capacity
 
             st.markdown(f"""
             <div class="result-container">
@@ -300,7 +332,7 @@ def main():
                 csv_data = export_grid_to_csv(specs)
                 st.download_button(
                     label="Download CSV",
-                    data=csv_data.getvalue(),
+                    data=csv_data,
                     file_name="grid_specifications.csv",
                     mime="text/csv"
                 )
@@ -320,7 +352,7 @@ def main():
         #Added AI analysis section here
         st.header("AI Analysis")
         with st.expander("Show AI Analysis", expanded=True):
-            show_ai_analysis(specs)
+            show_ai_analysis(specs, analysis_future)
 
 
     # Grid Comparison Section
@@ -345,5 +377,9 @@ def main():
                 use_container_width=True
             )
 
+        st.subheader("🤖 AI Comparison")
+        if st.button("Analyze Presets"):
+            show_preset_analyses(st.session_state.presets)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Optional
-import json
+import numpy as np
+import orjson
 
 # Thruster specifications in Newtons
 THRUSTER_SPECS = {
@@ -18,7 +20,12 @@ THRUSTER_SPECS = {
     }
 }
 
-@dataclass
+# Per-type thrust vectors in a fixed order for SoA thrust calculation
+THRUSTER_KINDS = tuple(THRUSTER_SPECS)
+_SMALL_SPEC = np.array([THRUSTER_SPECS[k]['small'] for k in THRUSTER_KINDS], dtype=np.float64)
+_LARGE_SPEC = np.array([THRUSTER_SPECS[k]['large'] for k in THRUSTER_KINDS], dtype=np.float64)
+
+@dataclass(frozen=True)
 class ThrusterCount:
     small: int = 0
     large: int = 0
@@ -37,33 +44,48 @@ class ThrusterCount:
     def from_dict(cls, data: dict) -> 'ThrusterCount':
         return cls(**data)
 
-@dataclass
+@dataclass(frozen=True)
 class GridSpecifications:
     mass: float
     gravity: float = 9.81  # Default Earth gravity
-    atmospheric_thrusters: ThrusterCount = None
-    ion_thrusters: ThrusterCount = None
-    hydrogen_thrusters: ThrusterCount = None
+    atmospheric_thrusters: ThrusterCount = field(default_factory=ThrusterCount)
+    ion_thrusters: ThrusterCount = field(default_factory=ThrusterCount)
+    hydrogen_thrusters: ThrusterCount = field(default_factory=ThrusterCount)
+
+    # Specs are immutable, so derived values are computed once per instance
+    def _count_vectors(self) -> tuple:
+        counts = (self.atmospheric_thrusters, self.ion_thrusters, self.hydrogen_thrusters)
+        smalls = np.array([c.small for c in counts], dtype=np.float64)
+        larges = np.array([c.large for c in counts], dtype=np.float64)
+        return smalls, larges
+
+    @cached_property
+    def thrust_by_type(self) -> dict:
+        smalls, larges = self._count_vectors()
+        thrusts = smalls * _SMALL_SPEC + larges * _LARGE_SPEC
+        return dict(zip(THRUSTER_KINDS, thrusts.tolist()))
 
-    def __post_init__(self):
-        self.atmospheric_thrusters = self.atmospheric_thrusters or ThrusterCount()
-        self.ion_thrusters = self.ion_thrusters or ThrusterCount()
-        self.hydrogen_thrusters = self.hydrogen_thrusters or ThrusterCount()
+    @cached_property
+    def total_thrust(self) -> float:
+        return sum(self.thrust_by_type.values())
+
+    @cached_property
+    def lift_capacity(self) -> float:
+        smalls, larges = self._count_vectors()
+        return float((smalls @ _SMALL_SPEC + larges @ _LARGE_SPEC) / self.gravity - self.mass)
+
+    @cached_property
+    def thrust_to_weight(self) -> float:
+        return self.total_thrust / (self.mass * self.gravity)
 
     def calculate_thrust_by_type(self) -> dict:
-        return {
-            'atmospheric': self.atmospheric_thrusters.calculate_thrust('atmospheric'),
-            'ion': self.ion_thrusters.calculate_thrust('ion'),
-            'hydrogen': self.hydrogen_thrusters.calculate_thrust('hydrogen')
-        }
+        return self.thrust_by_type
 
     def calculate_total_thrust(self) -> float:
-        thrusts = self.calculate_thrust_by_type()
-        return sum(thrusts.values())
+        return self.total_thrust
 
     def calculate_lift_capacity(self) -> float:
-        total_thrust = self.calculate_total_thrust()
-        return (total_thrust - (self.mass * self.gravity)) / self.gravity
+        return self.lift_capacity
 
     def to_dict(self) -> dict:
         return {
@@ -88,14 +110,14 @@ class Preset:
     specifications: GridSpecifications
 
     def save(self) -> str:
-        return json.dumps({
+        return orjson.dumps({
             'name': self.name,
             'specifications': self.specifications.to_dict()
-        })
+        }).decode()
 
     @classmethod
     def load(cls, data: str) -> 'Preset':
-        parsed = json.loads(data)
+        parsed = orjson.loads(data)
         return cls(
             name=parsed['name'],
             specifications=GridSpecifications.from_dict(parsed['specifications'])
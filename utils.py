@@ -1,278 +1,324 @@
 import streamlit as st
 import plotly.graph_objects as go
+import numpy as np
 from models import GridSpecifications, Preset, THRUSTER_SPECS
-import json
-import plotly.express as px
-import pandas as pd
+import orjson
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import io
-import csv
-
+from functools import lru_cache
+
+def _specs_key(specs: GridSpecifications) -> str:
+    """Canonical cache key for a grid configuration."""
+    return orjson.dumps(specs.to_dict(), option=orjson.OPT_SORT_KEYS).decode()
+
+# PDF report styles are immutable once built, so construct them once at import
+_PDF_STYLES = getSampleStyleSheet()
+
+_PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLES['Heading1'],
+    spaceAfter=30
+)
+
+# Explicit row heights skip ReportLab's per-row measurement; this matches the
+# measured height of a single-line row with the table padding below
+_PDF_ROW_HEIGHT = 0.25 * inch
+
+# Label column shaded
+_PDF_BASIC_TABLE_STYLE = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ('PADDING', (0, 0), (-1, -1), 6),
+])
+
+# Header row and label column shaded
+_PDF_HEADER_TABLE_STYLE = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
+    ('PADDING', (0, 0), (-1, -1), 6),
+])
+
+def _preset_key(preset: Preset) -> str:
+    """Canonical cache key for a saved preset."""
+    return f"{preset.name}\0{_specs_key(preset.specifications)}"
+
+# Derived artifacts are pure functions of their inputs, so cache them across reruns
+_CACHE_HASH_FUNCS = {GridSpecifications: _specs_key, Preset: _preset_key}
+
+@st.cache_data(ttl=600, max_entries=64, hash_funcs=_CACHE_HASH_FUNCS, show_spinner=False)
 def create_thrust_chart(specs: GridSpecifications) -> go.Figure:
     """Create a pie chart showing thrust distribution."""
     thrusts = specs.calculate_thrust_by_type()
     labels = ['Atmospheric', 'Ion', 'Hydrogen']
     values = [thrusts['atmospheric'], thrusts['ion'], thrusts['hydrogen']]
 
-    fig = go.Figure(data=[go.Pie(
-        labels=labels,
-        values=values,
-        hole=.3,
-        marker_colors=['#FF9999', '#66B2FF', '#99FF99']
-    )])
-
-    fig.update_layout(
-        title="Thrust Distribution",
-        showlegend=True,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
+    return go.Figure(
+        data=[dict(
+            type='pie',
+            labels=labels,
+            values=values,
+            hole=.3,
+            marker=dict(colors=['#FF9999', '#66B2FF', '#99FF99'])
+        )],
+        layout=dict(
+            title="Thrust Distribution",
+            showlegend=True,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white')
+        )
     )
 
-    return fig
-
+@st.cache_data(ttl=600, max_entries=64, hash_funcs=_CACHE_HASH_FUNCS, show_spinner=False)
 def create_comparison_chart(presets: dict[str, Preset]) -> go.Figure:
     """Create a bar chart comparing different grid configurations."""
-    data = []
-
-    for name, preset_json in presets.items():
-        preset = Preset.load(preset_json)
-        specs = preset.specifications
-        thrusts = specs.calculate_thrust_by_type()
-
-        data.extend([
-            {'Grid': name, 'Thruster Type': 'Atmospheric', 'Thrust (N)': thrusts['atmospheric']},
-            {'Grid': name, 'Thruster Type': 'Ion', 'Thrust (N)': thrusts['ion']},
-            {'Grid': name, 'Thruster Type': 'Hydrogen', 'Thrust (N)': thrusts['hydrogen']}
-        ])
-
-    df = pd.DataFrame(data)
-
-    fig = px.bar(
-        df,
-        x='Grid',
-        y='Thrust (N)',
-        color='Thruster Type',
-        barmode='group',
-        color_discrete_map={
-            'Atmospheric': '#FF9999',
-            'Ion': '#66B2FF',
-            'Hydrogen': '#99FF99'
-        }
+    names, atmospheric, ion, hydrogen = [], [], [], []
+
+    for name, preset in presets.items():
+        thrusts = preset.specifications.thrust_by_type
+
+        names.append(name)
+        atmospheric.append(thrusts['atmospheric'])
+        ion.append(thrusts['ion'])
+        hydrogen.append(thrusts['hydrogen'])
+
+    return go.Figure(
+        data=[
+            dict(type='bar', name='Atmospheric', x=names, y=atmospheric, marker=dict(color='#FF9999')),
+            dict(type='bar', name='Ion', x=names, y=ion, marker=dict(color='#66B2FF')),
+            dict(type='bar', name='Hydrogen', x=names, y=hydrogen, marker=dict(color='#99FF99'))
+        ],
+        layout=dict(
+            barmode='group',
+            xaxis=dict(title=dict(text='Grid')),
+            yaxis=dict(title=dict(text='Thrust (N)')),
+            legend=dict(title=dict(text='Thruster Type')),
+            title="Grid Comparison - Thrust by Type",
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white')
+        )
     )
 
-    fig.update_layout(
-        title="Grid Comparison - Thrust by Type",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
-    )
-
-    return fig
+# Radar chart normalization, stored as reciprocals of the reference maxima
+_INV_MAX_THRUST = 1 / 1e7  # 10 million Newtons as reference
+_INV_MAX_LIFT = 1 / 1e6    # 1 million kg as reference
+_INV_MAX_TWR = 1 / 10      # 10:1 as reference
 
+@st.cache_data(ttl=600, max_entries=64, hash_funcs=_CACHE_HASH_FUNCS, show_spinner=False)
 def create_metrics_comparison(presets: dict[str, Preset]) -> go.Figure:
     """Create a radar chart comparing key metrics of different grids."""
-    data = []
     categories = ['Total Thrust', 'Lift Capacity', 'TWR']
-
-    for name, preset_json in presets.items():
-        preset = Preset.load(preset_json)
-        specs = preset.specifications
-        total_thrust = specs.calculate_total_thrust()
-        lift_capacity = specs.calculate_lift_capacity()
-        twr = total_thrust / (specs.mass * specs.gravity)
-
-        # Normalize values for better visualization
-        max_thrust = 1e7  # 10 million Newtons as reference
-        max_lift = 1e6    # 1 million kg as reference
-        max_twr = 10      # 10:1 as reference
-
-        data.append(go.Scatterpolar(
-            r=[
-                total_thrust / max_thrust,
-                lift_capacity / max_lift if lift_capacity > 0 else 0,
-                min(twr / max_twr, 1)
-            ],
+    specs_list = [preset.specifications for preset in presets.values()]
+
+    thrusts = np.array([specs.total_thrust for specs in specs_list], dtype=np.float64)
+    lifts = np.array([specs.lift_capacity for specs in specs_list], dtype=np.float64)
+    twrs = np.array([specs.thrust_to_weight for specs in specs_list], dtype=np.float64)
+
+    # Normalize every preset at once; negative lift shows as 0 and TWR is capped at 1
+    r_matrix = np.stack([
+        thrusts * _INV_MAX_THRUST,
+        np.maximum(lifts, 0) * _INV_MAX_LIFT,
+        np.minimum(twrs * _INV_MAX_TWR, 1.0)
+    ], axis=1)
+
+    data = [
+        dict(
+            type='scatterpolar',
+            r=r,
             theta=categories,
             name=name,
             fill='toself'
-        ))
-
-    fig = go.Figure(data=data)
-
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 1]
-            )
-        ),
-        showlegend=True,
-        title="Grid Comparison - Key Metrics",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
+        )
+        for name, r in zip(presets, r_matrix.tolist())
+    ]
+
+    return go.Figure(
+        data=data,
+        layout=dict(
+            polar=dict(
+                radialaxis=dict(
+                    visible=True,
+                    range=[0, 1]
+                )
+            ),
+            showlegend=True,
+            title="Grid Comparison - Key Metrics",
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white')
+        )
     )
 
-    return fig
+def _csv_number(number: float) -> str:
+    """Format a number as a CSV field, quoting it when it contains separators."""
+    formatted = format_number(number)
+    return f'"{formatted}"' if ',' in formatted else formatted
 
-def export_grid_to_csv(specs: GridSpecifications) -> io.StringIO:
+@st.cache_data(ttl=600, max_entries=64, hash_funcs=_CACHE_HASH_FUNCS, show_spinner=False)
+def export_grid_to_csv(specs: GridSpecifications) -> str:
     """Export grid specifications to CSV format."""
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow(['Space Engineers Grid Specifications'])
-    writer.writerow([])
-
-    # Basic specifications
-    writer.writerow(['Basic Specifications'])
-    writer.writerow(['Mass (kg)', specs.mass])
-    writer.writerow(['Gravity (m/s²)', specs.gravity])
-    writer.writerow([])
-
-    # Thruster counts
-    writer.writerow(['Thruster Configuration'])
-    writer.writerow(['Type', 'Small', 'Large'])
-    writer.writerow(['Atmospheric', specs.atmospheric_thrusters.small, specs.atmospheric_thrusters.large])
-    writer.writerow(['Ion', specs.ion_thrusters.small, specs.ion_thrusters.large])
-    writer.writerow(['Hydrogen', specs.hydrogen_thrusters.small, specs.hydrogen_thrusters.large])
-    writer.writerow([])
-
-    # Results
-    writer.writerow(['Performance Analysis'])
-    thrusts = specs.calculate_thrust_by_type()
-    total_thrust = specs.calculate_total_thrust()
-    lift_capacity = specs.calculate_lift_capacity()
-
-    writer.writerow(['Total Thrust (N)', format_number(total_thrust)])
-    for thruster_type, thrust in thrusts.items():
-        writer.writerow([f'{thruster_type.title()} Thrust (N)', format_number(thrust)])
-    writer.writerow(['Required Hover Thrust (N)', format_number(specs.mass * specs.gravity)])
-    writer.writerow(['Lift Capacity (kg)', format_number(lift_capacity)])
-    writer.writerow(['Thrust-to-Weight Ratio', format_number(total_thrust / (specs.mass * specs.gravity))])
-
-    output.seek(0)
-    return output
+    thrusts = specs.thrust_by_type
+    total_thrust = specs.total_thrust
+    lift_capacity = specs.lift_capacity
+    weight = specs.mass * specs.gravity
+    twr = total_thrust / weight
+
+    # Rows are fixed, so the CSV is rendered in one pass with csv.writer's
+    # minimal quoting applied to the thousands-separated numbers
+    return (
+        "Space Engineers Grid Specifications\r\n"
+        "\r\n"
+        "Basic Specifications\r\n"
+        f"Mass (kg),{specs.mass}\r\n"
+        f"Gravity (m/s²),{specs.gravity}\r\n"
+        "\r\n"
+        "Thruster Configuration\r\n"
+        "Type,Small,Large\r\n"
+        f"Atmospheric,{specs.atmospheric_thrusters.small},{specs.atmospheric_thrusters.large}\r\n"
+        f"Ion,{specs.ion_thrusters.small},{specs.ion_thrusters.large}\r\n"
+        f"Hydrogen,{specs.hydrogen_thrusters.small},{specs.hydrogen_thrusters.large}\r\n"
+        "\r\n"
+        "Performance Analysis\r\n"
+        f"Total Thrust (N),{_csv_number(total_thrust)}\r\n"
+        f"Atmospheric Thrust (N),{_csv_number(thrusts['atmospheric'])}\r\n"
+        f"Ion Thrust (N),{_csv_number(thrusts['ion'])}\r\n"
+        f"Hydrogen Thrust (N),{_csv_number(thrusts['hydrogen'])}\r\n"
+        f"Required Hover Thrust (N),{_csv_number(weight)}\r\n"
+        f"Lift Capacity (kg),{_csv_number(lift_capacity)}\r\n"
+        f"Thrust-to-Weight Ratio,{_csv_number(twr)}\r\n"
+    )
 
+@st.cache_data(ttl=600, max_entries=64, hash_funcs=_CACHE_HASH_FUNCS, show_spinner=False)
 def create_pdf_report(specs: GridSpecifications) -> bytes:
     """Create a PDF report of grid specifications."""
+    thrusts = specs.thrust_by_type
+    total_thrust = specs.total_thrust
+    lift_capacity = specs.lift_capacity
+    weight = specs.mass * specs.gravity
+    twr = total_thrust / weight
+
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
     elements = []
 
     # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        spaceAfter=30
-    )
-    elements.append(Paragraph("Space Engineers Grid Report", title_style))
+    elements.append(Paragraph("Space Engineers Grid Report", _PDF_TITLE_STYLE))
     elements.append(Spacer(1, 0.2 * inch))
 
     # Basic Specifications
-    elements.append(Paragraph("Basic Specifications", styles['Heading2']))
-    basic_data = [
-        ['Mass (kg)', format_number(specs.mass)],
-        ['Gravity (m/s²)', format_number(specs.gravity)]
-    ]
-    basic_table = Table(basic_data, colWidths=[2*inch, 2*inch])
-    basic_table.setStyle(TableStyle([
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('PADDING', (0, 0), (-1, -1), 6),
-    ]))
+    elements.append(Paragraph("Basic Specifications", _PDF_STYLES['Heading2']))
+    basic_data = (
+        ('Mass (kg)', format_number(specs.mass)),
+        ('Gravity (m/s²)', format_number(specs.gravity))
+    )
+    basic_table = Table(
+        basic_data,
+        colWidths=[2*inch, 2*inch],
+        rowHeights=[_PDF_ROW_HEIGHT] * len(basic_data)
+    )
+    basic_table.setStyle(_PDF_BASIC_TABLE_STYLE)
     elements.append(basic_table)
     elements.append(Spacer(1, 0.2 * inch))
 
     # Thruster Configuration
-    elements.append(Paragraph("Thruster Configuration", styles['Heading2']))
-    thruster_data = [
-        ['Type', 'Small', 'Large'],
-        ['Atmospheric', str(specs.atmospheric_thrusters.small), str(specs.atmospheric_thrusters.large)],
-        ['Ion', str(specs.ion_thrusters.small), str(specs.ion_thrusters.large)],
-        ['Hydrogen', str(specs.hydrogen_thrusters.small), str(specs.hydrogen_thrusters.large)]
-    ]
-    thruster_table = Table(thruster_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-    thruster_table.setStyle(TableStyle([
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-        ('PADDING', (0, 0), (-1, -1), 6),
-    ]))
+    elements.append(Paragraph("Thruster Configuration", _PDF_STYLES['Heading2']))
+    thruster_data = (
+        ('Type', 'Small', 'Large'),
+        ('Atmospheric', str(specs.atmospheric_thrusters.small), str(specs.atmospheric_thrusters.large)),
+        ('Ion', str(specs.ion_thrusters.small), str(specs.ion_thrusters.large)),
+        ('Hydrogen', str(specs.hydrogen_thrusters.small), str(specs.hydrogen_thrusters.large))
+    )
+    thruster_table = Table(
+        thruster_data,
+        colWidths=[2*inch, 1.5*inch, 1.5*inch],
+        rowHeights=[_PDF_ROW_HEIGHT] * len(thruster_data)
+    )
+    thruster_table.setStyle(_PDF_HEADER_TABLE_STYLE)
     elements.append(thruster_table)
     elements.append(Spacer(1, 0.2 * inch))
 
     # Performance Analysis
-    elements.append(Paragraph("Performance Analysis", styles['Heading2']))
-    thrusts = specs.calculate_thrust_by_type()
-    total_thrust = specs.calculate_total_thrust()
-    lift_capacity = specs.calculate_lift_capacity()
-
-    performance_data = [
-        ['Metric', 'Value'],
-        ['Total Thrust (N)', format_number(total_thrust)],
-        ['Atmospheric Thrust (N)', format_number(thrusts['atmospheric'])],
-        ['Ion Thrust (N)', format_number(thrusts['ion'])],
-        ['Hydrogen Thrust (N)', format_number(thrusts['hydrogen'])],
-        ['Required Hover Thrust (N)', format_number(specs.mass * specs.gravity)],
-        ['Lift Capacity (kg)', format_number(lift_capacity)],
-        ['Thrust-to-Weight Ratio', format_number(total_thrust / (specs.mass * specs.gravity))]
-    ]
-    performance_table = Table(performance_data, colWidths=[2.5*inch, 2.5*inch])
-    performance_table.setStyle(TableStyle([
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-        ('PADDING', (0, 0), (-1, -1), 6),
-    ]))
+    elements.append(Paragraph("Performance Analysis", _PDF_STYLES['Heading2']))
+    performance_data = (
+        ('Metric', 'Value'),
+        ('Total Thrust (N)', format_number(total_thrust)),
+        ('Atmospheric Thrust (N)', format_number(thrusts['atmospheric'])),
+        ('Ion Thrust (N)', format_number(thrusts['ion'])),
+        ('Hydrogen Thrust (N)', format_number(thrusts['hydrogen'])),
+        ('Required Hover Thrust (N)', format_number(weight)),
+        ('Lift Capacity (kg)', format_number(lift_capacity)),
+        ('Thrust-to-Weight Ratio', format_number(twr))
+    )
+    performance_table = Table(
+        performance_data,
+        colWidths=[2.5*inch, 2.5*inch],
+        rowHeights=[_PDF_ROW_HEIGHT] * len(performance_data)
+    )
+    performance_table.setStyle(_PDF_HEADER_TABLE_STYLE)
     elements.append(performance_table)
 
+    # ReportLab renders the whole document in memory and writes it in one call
     doc.build(elements)
-    buffer.seek(0)
     return buffer.getvalue()
 
+@st.cache_resource
+def _css_markup() -> str:
+    """Read the custom stylesheet and wrap it in a style tag once per process."""
+    with open('styles.css') as f:
+        return f'<style>{f.read()}</style>'
+
 def load_css():
     """Load custom CSS."""
-    with open('styles.css') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+    # Streamlit drops elements a rerun doesn't emit, so the style block has to be
+    # sent every run; only the markup itself is built once
+    st.markdown(_css_markup(), unsafe_allow_html=True)
 
 def save_preset(preset: Preset):
     """Save a preset to session state."""
     if 'presets' not in st.session_state:
         st.session_state.presets = {}
-    st.session_state.presets[preset.name] = preset.save()
+    st.session_state.presets[preset.name] = preset
 
 def load_preset(name: str) -> Preset:
     """Load a preset from session state."""
     if 'presets' not in st.session_state or name not in st.session_state.presets:
         return None
-    return Preset.load(st.session_state.presets[name])
+    return st.session_state.presets[name]
+
+_FMT = "{:,.2f}".format
 
+@lru_cache(maxsize=2048)
 def format_number(number: float) -> str:
     """Format a number with thousand separators."""
-    return f"{number:,.2f}"
+    return _FMT(number)
 
-def get_thrust_tooltip(thruster_type: str) -> str:
-    """Generate tooltip text for thruster inputs."""
-    specs = THRUSTER_SPECS[thruster_type]
-    return (
+_THRUST_TOOLTIPS = {
+    thruster_type: (
         f"Small: {format_number(specs['small'])}N each\n"
         f"Large: {format_number(specs['large'])}N each"
     )
+    for thruster_type, specs in THRUSTER_SPECS.items()
+}
 
-def get_ai_analysis_tooltip() -> str:
-    """Generate tooltip text for AI analysis section."""
-    return """
+_AI_TOOLTIP = """
     The AI Analysis provides:
     - Efficiency Assessment: Overall evaluation of your grid's performance
     - Optimization Suggestions: Specific ways to improve your configuration
     - Use Cases: Recommended scenarios for your grid
     - Efficiency Score: 0-100 rating based on thrust distribution and TWR
     - Balance Analysis: Evaluation of thruster type distribution
-    """
\ No newline at end of file
+    """
+
+def get_thrust_tooltip(thruster_type: str) -> str:
+    """Generate tooltip text for thruster inputs."""
+    return _THRUST_TOOLTIPS[thruster_type]
+
+def get_ai_analysis_tooltip() -> str:
+    """Generate tooltip text for AI analysis section."""
+    return _AI_TOOLTIP